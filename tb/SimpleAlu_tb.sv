@@ -0,0 +1,45 @@
+`default_nettype none
+
+//=============================================================================
+// Module: SimpleAlu_tb
+// Description: Simulation wrapper for SimpleAlu that also packs all outputs
+//              into one status bus, so the testbench samples a single signal
+//              per transaction
+// License: Apache License 2.0
+//=============================================================================
+
+module SimpleAlu_tb #(
+  parameter int DATA_WIDTH = 32
+) (
+  // Data inputs
+  input  logic [DATA_WIDTH-1:0] a_i,
+  input  logic [DATA_WIDTH-1:0] b_i,
+  input  logic [3:0]            op_i,
+  
+  // Data outputs
+  output logic [DATA_WIDTH-1:0] result_o,
+  output logic                  zero_o,
+  output logic                  overflow_o,
+  output logic                  carry_o,
+  
+  // Packed outputs: {overflow, zero, carry, result}
+  output logic [DATA_WIDTH+2:0] status_o
+);
+
+  SimpleAlu #(
+    .DATA_WIDTH(DATA_WIDTH)
+  ) u_alu (
+    .a_i        (a_i),
+    .b_i        (b_i),
+    .op_i       (op_i),
+    .result_o   (result_o),
+    .zero_o     (zero_o),
+    .overflow_o (overflow_o),
+    .carry_o    (carry_o)
+  );
+
+  assign status_o = {overflow_o, zero_o, carry_o, result_o};
+
+endmodule
+
+`default_nettype wire
\ No newline at end of file
@@ -7,10 +7,16 @@ Tests all ALU operations with comprehensive coverage
 
 import cocotb
 from cocotb.triggers import Timer
-from cocotb.binary import BinaryValue
+import operator
 import random
+import sys
 import pytest
 
+if sys.implementation.name == "cpython":
+    import numpy as np
+else:  # Keep PyPy runs on the pure-Python path
+    np = None
+
 # ALU operation codes
 ALU_ADD  = 0x0
 ALU_SUB  = 0x1
@@ -25,158 +31,174 @@ ALU_SLTU = 0x9
 ALU_NOR  = 0xA
 ALU_NAND = 0xB
 
+# Opcodes drawn by the random test, and display names for failure messages
+_ALU_OP_CHOICES = (ALU_ADD, ALU_SUB, ALU_AND, ALU_OR, ALU_XOR,
+                   ALU_SLL, ALU_SRL, ALU_SRA, ALU_SLT, ALU_SLTU)
+_OP_NAMES = {
+    ALU_ADD: "ADD", ALU_SUB: "SUB", ALU_AND: "AND", ALU_OR: "OR",
+    ALU_XOR: "XOR", ALU_SLL: "SLL", ALU_SRL: "SRL", ALU_SRA: "SRA",
+    ALU_SLT: "SLT", ALU_SLTU: "SLTU", ALU_NOR: "NOR", ALU_NAND: "NAND",
+}
+
+# Unassigned opcodes; the ALU must output zero for these
+_INVALID_OPS = (0xC, 0xD, 0xE, 0xF)
+
+DATA_WIDTH = 32
+MAX_VAL = (1 << DATA_WIDTH) - 1
+SIGN_BIT = 1 << (DATA_WIDTH - 1)
+
+
+# Reference model: each function returns (result, carry, zero, overflow)
+def _flags(result):
+    """Pack a result with no carry or overflow into an expected tuple"""
+    return result, 0, 1 if result == 0 else 0, 0
+
+
+def _ref_add(a, b):
+    total = a + b
+    result = total & MAX_VAL
+    # Signed overflow: both operands share a sign that the result does not
+    overflow = (((a ^ result) & (b ^ result)) >> (DATA_WIDTH - 1)) & 1
+    return result, total >> DATA_WIDTH, 1 if result == 0 else 0, overflow
+
+
+def _ref_sub(a, b):
+    diff = a - b
+    result = diff & MAX_VAL
+    # Signed overflow: operand signs differ and the result sign differs from a
+    overflow = (((a ^ b) & (a ^ result)) >> (DATA_WIDTH - 1)) & 1
+    return result, (diff >> DATA_WIDTH) & 1, 1 if result == 0 else 0, overflow
+
+
+def _logical_ref(fn):
+    """Build a reference function for a bitwise operation"""
+    def ref(a, b):
+        return _flags(fn(a, b) & MAX_VAL)
+    return ref
+
+
+_ref_and = _logical_ref(operator.and_)
+_ref_or = _logical_ref(operator.or_)
+_ref_xor = _logical_ref(operator.xor)
+_ref_nor = _logical_ref(lambda a, b: ~(a | b))
+_ref_nand = _logical_ref(lambda a, b: ~(a & b))
+
+
+def _ref_sll(a, b):
+    return _flags((a << (b & 0x1F)) & MAX_VAL)
+
+
+def _ref_srl(a, b):
+    return _flags(a >> (b & 0x1F))
+
+
+def _ref_sra(a, b):
+    # Sign-extend a without branching, then shift
+    return _flags(((a - ((a & SIGN_BIT) << 1)) >> (b & 0x1F)) & MAX_VAL)
+
+
+def _ref_slt(a, b):
+    # Flipping the sign bit maps signed order onto unsigned order
+    return _flags(1 if (a ^ SIGN_BIT) < (b ^ SIGN_BIT) else 0)
+
+
+def _ref_sltu(a, b):
+    return _flags(1 if a < b else 0)
+
+
+REFERENCE = {
+    ALU_ADD:  _ref_add,
+    ALU_SUB:  _ref_sub,
+    ALU_AND:  _ref_and,
+    ALU_OR:   _ref_or,
+    ALU_XOR:  _ref_xor,
+    ALU_SLL:  _ref_sll,
+    ALU_SRL:  _ref_srl,
+    ALU_SRA:  _ref_sra,
+    ALU_SLT:  _ref_slt,
+    ALU_SLTU: _ref_sltu,
+    ALU_NOR:  _ref_nor,
+    ALU_NAND: _ref_nand,
+}
+
+
+def _expected(a, b, op):
+    """Return the expected (result, carry, zero, overflow) for one operation"""
+    return REFERENCE[op](a, b)
+
+
+def _pack_status(result, carry, zero, overflow):
+    """Pack outputs in the layout of SimpleAlu_tb.status_o"""
+    return (result | (carry << DATA_WIDTH) |
+            (zero << (DATA_WIDTH + 1)) | (overflow << (DATA_WIDTH + 2)))
+
+
+def _unpack_status(status):
+    """Split a status_o value into (result, carry, zero, overflow)"""
+    return (status & MAX_VAL, (status >> DATA_WIDTH) & 1,
+            (status >> (DATA_WIDTH + 1)) & 1, (status >> (DATA_WIDTH + 2)) & 1)
+
+
+def _describe_mismatch(op, a, b, expected_status, actual_status):
+    """Format a failure message listing every output that differs"""
+    diffs = [
+        f"{name} expected {exp:x}, got {got:x}"
+        for name, exp, got in zip(("result", "carry", "zero", "overflow"),
+                                  _unpack_status(expected_status),
+                                  _unpack_status(actual_status))
+        if exp != got
+    ]
+    return f"{_OP_NAMES[op]}(a={a:08x}, b={b:08x}): " + "; ".join(diffs)
+
+
 class AluTester:
     """Helper class for ALU testing"""
     
     def __init__(self, dut):
-        self.dut = dut
-        self.data_width = 32
-        self.max_val = (1 << self.data_width) - 1
+        self.max_val = MAX_VAL
+        self.pending = []
+        
+        # Cache signal handles to avoid a hierarchy lookup on every access
+        self.a_h = dut.a_i
+        self.b_h = dut.b_i
+        self.op_h = dut.op_i
+        self.status_h = dut.status_o
         
     async def apply_inputs(self, a, b, op):
         """Apply inputs to ALU and wait for propagation"""
-        self.dut.a_i.value = a
-        self.dut.b_i.value = b
-        self.dut.op_i.value = op
-        await Timer(1, units='ns')  # Allow combinational logic to settle
-        
-    def to_signed(self, val):
-        """Convert unsigned to signed representation"""
-        if val >= (1 << (self.data_width - 1)):
-            return val - (1 << self.data_width)
-        return val
-        
-    def to_unsigned(self, val):
-        """Convert signed to unsigned representation"""
-        if val < 0:
-            return val + (1 << self.data_width)
-        return val & self.max_val
-        
-    async def check_add(self, a, b):
-        """Test addition operation"""
-        await self.apply_inputs(a, b, ALU_ADD)
-        
-        expected_result = (a + b) & self.max_val
-        expected_carry = 1 if (a + b) > self.max_val else 0
-        expected_zero = 1 if expected_result == 0 else 0
+        self.a_h.value = a
+        self.b_h.value = b
+        self.op_h.value = op
+        await Timer(1, units='step')  # Combinational logic settles within one time step
         
-        # Check overflow for signed addition
-        a_signed = self.to_signed(a)
-        b_signed = self.to_signed(b)
-        result_signed = self.to_signed(expected_result)
-        expected_overflow = 0
-        if (a_signed >= 0 and b_signed >= 0 and result_signed < 0) or \
-           (a_signed < 0 and b_signed < 0 and result_signed >= 0):
-            expected_overflow = 1
-            
-        assert self.dut.result_o.value == expected_result, \
-            f"ADD: Expected result {expected_result:08x}, got {self.dut.result_o.value:08x}"
-        assert self.dut.carry_o.value == expected_carry, \
-            f"ADD: Expected carry {expected_carry}, got {self.dut.carry_o.value}"
-        assert self.dut.zero_o.value == expected_zero, \
-            f"ADD: Expected zero {expected_zero}, got {self.dut.zero_o.value}"
-        assert self.dut.overflow_o.value == expected_overflow, \
-            f"ADD: Expected overflow {expected_overflow}, got {self.dut.overflow_o.value}"
-            
-    async def check_sub(self, a, b):
-        """Test subtraction operation"""
-        await self.apply_inputs(a, b, ALU_SUB)
+    def queue(self, a, b, op):
+        """Queue a stimulus with its precomputed expected outputs for run_batch"""
+        self.pending.append((a, b, op, _pack_status(*_expected(a, b, op))))
         
-        expected_result = (a - b) & self.max_val
-        expected_carry = 1 if a < b else 0
-        expected_zero = 1 if expected_result == 0 else 0
+    async def run_batch(self):
+        """Drive all queued stimuli in order, then check the packed DUT outputs"""
+        a_h, b_h, op_h, status_h = self.a_h, self.b_h, self.op_h, self.status_h
+        # Expectations are computed at queue time: cocotb coroutines share one
+        # thread with the simulator, so a concurrent producer task could not
+        # overlap reference-model work with DUT evaluation.
+        pending, self.pending = self.pending, []
+        actual = []
+        record = actual.append
+        for a, b, op, _ in pending:
+            # Plain ints take cocotb's direct write path; no BinaryValue is built
+            a_h.value = a
+            b_h.value = b
+            op_h.value = op
+            await Timer(1, units='step')  # Combinational logic settles within one time step
+            record(int(status_h.value))
         
-        # Check overflow for signed subtraction
-        a_signed = self.to_signed(a)
-        b_signed = self.to_signed(b)
-        result_signed = self.to_signed(expected_result)
-        expected_overflow = 0
-        if (a_signed >= 0 and b_signed < 0 and result_signed < 0) or \
-           (a_signed < 0 and b_signed >= 0 and result_signed >= 0):
-            expected_overflow = 1
-            
-        assert self.dut.result_o.value == expected_result, \
-            f"SUB: Expected result {expected_result:08x}, got {self.dut.result_o.value:08x}"
-        assert self.dut.carry_o.value == expected_carry, \
-            f"SUB: Expected carry {expected_carry}, got {self.dut.carry_o.value}"
-        assert self.dut.zero_o.value == expected_zero, \
-            f"SUB: Expected zero {expected_zero}, got {self.dut.zero_o.value}"
-        assert self.dut.overflow_o.value == expected_overflow, \
-            f"SUB: Expected overflow {expected_overflow}, got {self.dut.overflow_o.value}"
-            
-    async def check_logical(self, a, b, op, op_name):
-        """Test logical operations"""
-        await self.apply_inputs(a, b, op)
-        
-        if op == ALU_AND:
-            expected_result = a & b
-        elif op == ALU_OR:
-            expected_result = a | b
-        elif op == ALU_XOR:
-            expected_result = a ^ b
-        elif op == ALU_NOR:
-            expected_result = (~(a | b)) & self.max_val
-        elif op == ALU_NAND:
-            expected_result = (~(a & b)) & self.max_val
-        else:
-            raise ValueError(f"Unknown logical operation: {op}")
-            
-        expected_zero = 1 if expected_result == 0 else 0
-        
-        assert self.dut.result_o.value == expected_result, \
-            f"{op_name}: Expected result {expected_result:08x}, got {self.dut.result_o.value:08x}"
-        assert self.dut.zero_o.value == expected_zero, \
-            f"{op_name}: Expected zero {expected_zero}, got {self.dut.zero_o.value}"
-        assert self.dut.carry_o.value == 0, \
-            f"{op_name}: Expected carry 0, got {self.dut.carry_o.value}"
-        assert self.dut.overflow_o.value == 0, \
-            f"{op_name}: Expected overflow 0, got {self.dut.overflow_o.value}"
-            
-    async def check_shift(self, a, b, op, op_name):
-        """Test shift operations"""
-        await self.apply_inputs(a, b, op)
-        
-        shift_amount = b & 0x1F  # Use lower 5 bits
-        
-        if op == ALU_SLL:
-            expected_result = (a << shift_amount) & self.max_val
-        elif op == ALU_SRL:
-            expected_result = a >> shift_amount
-        elif op == ALU_SRA:
-            # Arithmetic right shift
-            a_signed = self.to_signed(a)
-            expected_result = self.to_unsigned(a_signed >> shift_amount)
-        else:
-            raise ValueError(f"Unknown shift operation: {op}")
-            
-        expected_zero = 1 if expected_result == 0 else 0
-        
-        assert self.dut.result_o.value == expected_result, \
-            f"{op_name}: Expected result {expected_result:08x}, got {self.dut.result_o.value:08x}"
-        assert self.dut.zero_o.value == expected_zero, \
-            f"{op_name}: Expected zero {expected_zero}, got {self.dut.zero_o.value}"
-            
-    async def check_compare(self, a, b, op, op_name):
-        """Test comparison operations"""
-        await self.apply_inputs(a, b, op)
-        
-        if op == ALU_SLT:
-            # Signed comparison
-            a_signed = self.to_signed(a)
-            b_signed = self.to_signed(b)
-            expected_result = 1 if a_signed < b_signed else 0
-        elif op == ALU_SLTU:
-            # Unsigned comparison
-            expected_result = 1 if a < b else 0
-        else:
-            raise ValueError(f"Unknown comparison operation: {op}")
-            
-        expected_zero = 1 if expected_result == 0 else 0
-        
-        assert self.dut.result_o.value == expected_result, \
-            f"{op_name}: Expected result {expected_result}, got {self.dut.result_o.value}"
-        assert self.dut.zero_o.value == expected_zero, \
-            f"{op_name}: Expected zero {expected_zero}, got {self.dut.zero_o.value}"
+        # Compare the whole batch at once and report the first mismatch
+        expected = [entry[3] for entry in pending]
+        if actual != expected:
+            i = next(i for i, (exp, got) in enumerate(zip(expected, actual)) if exp != got)
+            a, b, op, _ = pending[i]
+            raise AssertionError(f"Vector {i}: " +
+                                 _describe_mismatch(op, a, b, expected[i], actual[i]))
 
 
 @cocotb.test()
@@ -185,32 +207,34 @@ async def test_basic_operations(dut):
     tester = AluTester(dut)
     
     # Test addition
-    await tester.check_add(0x12345678, 0x87654321)
-    await tester.check_add(0xFFFFFFFF, 0x00000001)  # Overflow case
-    await tester.check_add(0x7FFFFFFF, 0x00000001)  # Signed overflow
+    tester.queue(0x12345678, 0x87654321, ALU_ADD)
+    tester.queue(0xFFFFFFFF, 0x00000001, ALU_ADD)  # Overflow case
+    tester.queue(0x7FFFFFFF, 0x00000001, ALU_ADD)  # Signed overflow
     
     # Test subtraction
-    await tester.check_sub(0x87654321, 0x12345678)
-    await tester.check_sub(0x00000001, 0xFFFFFFFF)  # Underflow case
-    await tester.check_sub(0x80000000, 0x00000001)  # Signed overflow
+    tester.queue(0x87654321, 0x12345678, ALU_SUB)
+    tester.queue(0x00000001, 0xFFFFFFFF, ALU_SUB)  # Underflow case
+    tester.queue(0x80000000, 0x00000001, ALU_SUB)  # Signed overflow
     
     # Test logical operations
-    await tester.check_logical(0xAAAAAAAA, 0x55555555, ALU_AND, "AND")
-    await tester.check_logical(0xAAAAAAAA, 0x55555555, ALU_OR, "OR")
-    await tester.check_logical(0xAAAAAAAA, 0x55555555, ALU_XOR, "XOR")
-    await tester.check_logical(0xAAAAAAAA, 0x55555555, ALU_NOR, "NOR")
-    await tester.check_logical(0xAAAAAAAA, 0x55555555, ALU_NAND, "NAND")
+    tester.queue(0xAAAAAAAA, 0x55555555, ALU_AND)
+    tester.queue(0xAAAAAAAA, 0x55555555, ALU_OR)
+    tester.queue(0xAAAAAAAA, 0x55555555, ALU_XOR)
+    tester.queue(0xAAAAAAAA, 0x55555555, ALU_NOR)
+    tester.queue(0xAAAAAAAA, 0x55555555, ALU_NAND)
     
     # Test shift operations
-    await tester.check_shift(0x12345678, 4, ALU_SLL, "SLL")
-    await tester.check_shift(0x12345678, 4, ALU_SRL, "SRL")
-    await tester.check_shift(0x87654321, 4, ALU_SRA, "SRA")  # Negative number
+    tester.queue(0x12345678, 4, ALU_SLL)
+    tester.queue(0x12345678, 4, ALU_SRL)
+    tester.queue(0x87654321, 4, ALU_SRA)  # Negative number
     
     # Test comparison operations
-    await tester.check_compare(0x12345678, 0x87654321, ALU_SLT, "SLT")
-    await tester.check_compare(0x87654321, 0x12345678, ALU_SLT, "SLT")
-    await tester.check_compare(0x12345678, 0x87654321, ALU_SLTU, "SLTU")
-    await tester.check_compare(0x87654321, 0x12345678, ALU_SLTU, "SLTU")
+    tester.queue(0x12345678, 0x87654321, ALU_SLT)
+    tester.queue(0x87654321, 0x12345678, ALU_SLT)
+    tester.queue(0x12345678, 0x87654321, ALU_SLTU)
+    tester.queue(0x87654321, 0x12345678, ALU_SLTU)
+    
+    await tester.run_batch()
 
 
 @cocotb.test()
@@ -219,19 +243,21 @@ async def test_edge_cases(dut):
     tester = AluTester(dut)
     
     # Test with zero
-    await tester.check_add(0x00000000, 0x00000000)
-    await tester.check_sub(0x00000000, 0x00000000)
-    await tester.check_logical(0x00000000, 0xFFFFFFFF, ALU_AND, "AND")
-    await tester.check_logical(0x00000000, 0x00000000, ALU_OR, "OR")
+    tester.queue(0x00000000, 0x00000000, ALU_ADD)
+    tester.queue(0x00000000, 0x00000000, ALU_SUB)
+    tester.queue(0x00000000, 0xFFFFFFFF, ALU_AND)
+    tester.queue(0x00000000, 0x00000000, ALU_OR)
     
     # Test with maximum values
-    await tester.check_add(0xFFFFFFFF, 0xFFFFFFFF)
-    await tester.check_sub(0xFFFFFFFF, 0xFFFFFFFF)
+    tester.queue(0xFFFFFFFF, 0xFFFFFFFF, ALU_ADD)
+    tester.queue(0xFFFFFFFF, 0xFFFFFFFF, ALU_SUB)
     
     # Test shift by zero and maximum
-    await tester.check_shift(0x12345678, 0, ALU_SLL, "SLL")
-    await tester.check_shift(0x12345678, 31, ALU_SRL, "SRL")
-    await tester.check_shift(0x80000000, 31, ALU_SRA, "SRA")
+    tester.queue(0x12345678, 0, ALU_SLL)
+    tester.queue(0x12345678, 31, ALU_SRL)
+    tester.queue(0x80000000, 31, ALU_SRA)
+    
+    await tester.run_batch()
 
 
 @cocotb.test()
@@ -239,29 +265,23 @@ async def test_random_operations(dut):
     """Test with random values for comprehensive coverage"""
     tester = AluTester(dut)
     
-    # Generate random test cases
-    for _ in range(100):
-        a = random.randint(0, tester.max_val)
-        b = random.randint(0, tester.max_val)
-        
-        # Test a random operation
-        op = random.choice([ALU_ADD, ALU_SUB, ALU_AND, ALU_OR, ALU_XOR, 
-                           ALU_SLL, ALU_SRL, ALU_SRA, ALU_SLT, ALU_SLTU])
-        
-        if op in [ALU_ADD]:
-            await tester.check_add(a, b)
-        elif op in [ALU_SUB]:
-            await tester.check_sub(a, b)
-        elif op in [ALU_AND, ALU_OR, ALU_XOR, ALU_NOR, ALU_NAND]:
-            op_names = {ALU_AND: "AND", ALU_OR: "OR", ALU_XOR: "XOR", 
-                       ALU_NOR: "NOR", ALU_NAND: "NAND"}
-            await tester.check_logical(a, b, op, op_names[op])
-        elif op in [ALU_SLL, ALU_SRL, ALU_SRA]:
-            op_names = {ALU_SLL: "SLL", ALU_SRL: "SRL", ALU_SRA: "SRA"}
-            await tester.check_shift(a, b, op, op_names[op])
-        elif op in [ALU_SLT, ALU_SLTU]:
-            op_names = {ALU_SLT: "SLT", ALU_SLTU: "SLTU"}
-            await tester.check_compare(a, b, op, op_names[op])
+    # Draw all random stimuli up front, seeded from cocotb's RNG for reproducibility
+    num_cases = 100
+    if np is not None:
+        rng = np.random.default_rng(random.getrandbits(32))
+        a_vals = rng.integers(0, tester.max_val, size=num_cases, dtype=np.uint32, endpoint=True)
+        b_vals = rng.integers(0, tester.max_val, size=num_cases, dtype=np.uint32, endpoint=True)
+        ops = rng.choice(np.array(_ALU_OP_CHOICES, dtype=np.uint8), size=num_cases)
+        cases = zip(a_vals.tolist(), b_vals.tolist(), ops.tolist())
+    else:
+        cases = [(random.getrandbits(DATA_WIDTH), random.getrandbits(DATA_WIDTH),
+                  random.choice(_ALU_OP_CHOICES)) for _ in range(num_cases)]
+    
+    # Queue random test cases, then drive them in one batch
+    for a, b, op in cases:
+        tester.queue(a, b, op)
+    
+    await tester.run_batch()
 
 
 @cocotb.test()
@@ -270,11 +290,12 @@ async def test_invalid_operations(dut):
     tester = AluTester(dut)
     
     # Test with invalid operation codes
-    for invalid_op in [0xC, 0xD, 0xE, 0xF]:
+    status_h = tester.status_h
+    for invalid_op in _INVALID_OPS:
         await tester.apply_inputs(0x12345678, 0x87654321, invalid_op)
         
         # Should return zero for invalid operations
-        assert dut.result_o.value == 0, \
-            f"Invalid op {invalid_op:x}: Expected result 0, got {dut.result_o.value:08x}"
-        assert dut.zero_o.value == 1, \
-            f"Invalid op {invalid_op:x}: Expected zero flag 1, got {dut.zero_o.value}"
\ No newline at end of file
+        result, _, zero, _ = _unpack_status(int(status_h.value))
+        if result or not zero:
+            raise AssertionError(f"Invalid op {invalid_op:x}: Expected result 0 and zero flag 1, "
+                                 f"got result {result:08x}, zero flag {zero}")